@@ -97,11 +97,13 @@ def chrome_crawler(driver_path: str, tar_domain: str, save_dir: str, wait_time:
                 he.switch_to_iframe(driver, cur_iframe_obj, i, sample_dir)
 
         # Get the performance log.
+        # Dump each entry as JSON, which is much faster to load than the Python repr.
+        # Keep non-ASCII characters as is, since the '\uXXXX' surrogate pairs of JSON are not decoded by 'eval'.
         entry_list = driver.get_log('performance')
         performance_log_path = os.path.join(sample_dir, 'performance_log.txt')
         with open(performance_log_path, 'w', encoding='utf-8') as fw:
             for entry in entry_list:
-                fw.write(str(entry) + '\n')
+                fw.write(json.dumps(entry, ensure_ascii=False) + '\n')
 
         # Get the response body log.
         response_list = list()
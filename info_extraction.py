@@ -12,6 +12,7 @@ Note that, the URLs (and the corresponding logged entries) are sometimes not req
 """
 
 
+import csv
 import json
 import os.path
 import time
@@ -28,6 +29,11 @@ from general_funcs import get_valid_url, url_cmp
 from redirection_tree import Node, RedirectionTree
 
 
+# Some node URLs (e.g., data URLs) exceed the default field size limit of the csv module.
+# The limit is a C long, which is 32-bit on Windows, so 'sys.maxsize' would overflow there.
+csv.field_size_limit(2 ** 31 - 1)
+
+
 def extract_target_entries(domain_sample: str, sample_dir: str, tar_method_idx_list: Optional[list] = None) -> list:
     """
     Extract the URL request-related entries from the performance log of the given sample.
@@ -1209,9 +1215,10 @@ def recover_tree(tar_sample: Optional[str] = None, label: Optional[str] = None)
     for node_file in file_list:
         if found:
             break
-        with open(node_file, 'r', encoding='utf-8') as fr:
-            for line in fr:
-                line = line.strip('\n').split('\t')
+        with open(node_file, 'r', encoding='utf-8', newline='', buffering=1 << 20) as fr:
+            # The node info is plain tab-separated text, so disable the quoting rules of csv.
+            reader = csv.reader(fr, delimiter='\t', quoting=csv.QUOTE_NONE)
+            for line in reader:
                 domain, label, source = line[0], line[1], line[2]
                 cur_sample = domain + ':' + source
                 node_id, url = line[3], line[4]
@@ -9,8 +9,8 @@ The functions in this script focus on various measurements.
 """
 
 import os
-import networkx as nx
 
+from collections import Counter
 from urllib.parse import urlsplit
 from pprint import pprint
 from redirection_tree import Node, RedirectionTree
@@ -18,6 +18,28 @@ from typing import Optional
 from info_extraction import extract_target_entries, get_parent_info, build_redirection_tree
 
 
+def get_degree_dict(node_list: list, edge_list: list) -> dict:
+    """
+    Get the degree (in-degree + out-degree) of each node in the directed graph formed by the given nodes and edges.
+    Only the degrees are needed in the measurement, so count them directly instead of building a networkx DiGraph.
+    Consistent with DiGraph, the repeated nodes and the parallel edges (same endpoints) are counted only once,
+        and the endpoints of edges are regarded as nodes as well.
+    :param node_list:
+    :param edge_list: [[src_node, dst_node, parent_source], ...]
+    :return: {node: degree, ...}
+    """
+    degree_counter = Counter(dict.fromkeys(node_list, 0))
+    edge_set = set()
+    for edge in edge_list:
+        node_pair = (edge[0], edge[1])
+        if node_pair in edge_set:
+            continue
+        edge_set.add(node_pair)
+        degree_counter[edge[0]] += 1
+        degree_counter[edge[1]] += 1
+    return dict(degree_counter)
+
+
 def measure_degree_distribution():
     """
     Measure the in- and out-degree of the redirection samples.
@@ -33,6 +55,7 @@ def measure_degree_distribution():
     1. Form the redirection tree;
     2. Extract the redirection nodes and the corresponding initiator nodes;
     3. Build the directed graph for whole tree and for chain-only, respectively.
+    Only the node degrees of the graphs are measured, which are counted directly from the edges.
     :return:
     """
     sample_source_dict = {
@@ -54,7 +77,7 @@ def measure_degree_distribution():
     sample_list = list()
     # entry_file = r'./data/modified_malicious_entries.txt'     # prior samples
     entry_file = r'./data/cur_entries.txt'      # cur samples
-    with open(entry_file, 'r', encoding='utf-8') as fr:
+    with open(entry_file, 'r', encoding='utf-8', buffering=1 << 20) as fr:
         for line in fr:
             line = line.strip('\n').split('\t')
             domain, source = line[0], line[2]
@@ -64,7 +87,7 @@ def measure_degree_distribution():
     initiator_info_dict = dict()
     # initiator_file = r'./data/malicious_initiator_entries.txt'        # prior samples
     initiator_file = r'./data/cur_initiator_entries.txt'        # cur samples
-    with open(initiator_file, 'r', encoding='utf-8') as fr:
+    with open(initiator_file, 'r', encoding='utf-8', buffering=1 << 20) as fr:
         for line in fr:
             line = line.strip('\n').split('\t')
             domain, source = line[0], line[2]
@@ -118,14 +141,8 @@ def measure_degree_distribution():
             if cur_edge in edge_list:
                 continue
             edge_list += [cur_edge]
-        # Construct the directed graph.
-        tree_graph = nx.DiGraph()
-        for i, node in enumerate(node_list):
-            node_desc = 'v' + str(i)
-            tree_graph.add_node(node, desc=node_desc)
-        for edge in edge_list:
-            tree_graph.add_edge(edge[0], edge[1], name=edge[2])
-        print(tree_graph.degree())
+        # Measure the node degrees of the directed graph.
+        print(get_degree_dict(node_list, edge_list))
 
         # 2. Build directed graph for the redirection chain.
         edge_list = list()
@@ -137,14 +154,8 @@ def measure_degree_distribution():
             if cur_edge in edge_list:
                 continue
             edge_list += [cur_edge]
-        # Construct the directed graph.
-        chain_graph = nx.DiGraph()
-        for i, node in enumerate(r_node_list + i_node_list):
-            node_desc = 'v' + str(i)
-            chain_graph.add_node(node, desc=node_desc)
-        for edge in edge_list:
-            chain_graph.add_edge(edge[0], edge[1], name=edge[2])
-        print(chain_graph.degree())
+        # Measure the node degrees of the directed graph.
+        print(get_degree_dict(r_node_list + i_node_list, edge_list))
     
 
 if __name__ == '__main__':
@@ -7,6 +7,8 @@
 """
 
 
+import sys
+
 from general_funcs import url_cmp
 from typing import Self, Union, Optional
 
@@ -28,10 +30,13 @@ class Node(object):
         self.url = url
         self.url_fragment = url_fragment
         self.parent = parent
-        self.parent_source = parent_source
-        self.resource_type = resource_type
+        # Both fields take only a handful of distinct values, so intern them.
+        # Nodes then share one string object per value instead of a copy per parsed line,
+        #   and equality checks against the literals hit the identity fast path.
+        self.parent_source = sys.intern(parent_source)
+        self.resource_type = sys.intern(resource_type)
         self.label = label
-        self.timestamp = timestamp
+        self.timestamp = int(timestamp)     # Canonicalize here so that lookups need not cast it again.
         self.children_list = list()     # [node1, node2, ...]
         if self.parent:     # Child node
             self.depth = parent.depth + 1
@@ -43,9 +48,22 @@ class RedirectionTree(object):
     def __init__(self, root: Node) -> None:
         """
         root_node is actually the first requested URL.
+        dfs_stack is shared by the DFS-based methods to avoid allocating a fresh stack per lookup.
+        Therefore, these methods are not re-entrant, i.e., do not start one DFS from within another on the same tree.
         :param root: An instance of Node object.
         """
         self.root = root
+        self.dfs_stack = list()
+
+    def reset_dfs_stack(self) -> list:
+        """
+        Clear the shared DFS stack and push the root node as the starting point.
+        :return: The reusable stack.
+        """
+        stack = self.dfs_stack
+        stack.clear()
+        stack += [self.root]
+        return stack
 
     def add_node(self, node: Node) -> None:
         """
@@ -82,7 +100,7 @@ class RedirectionTree(object):
         :return: Node instance or None
         """
         tar_node = None
-        stack = [self.root]
+        stack = self.reset_dfs_stack()
         while stack:
             cur_node = stack.pop()
             cur_node_url = cur_node.url
@@ -111,7 +129,7 @@ class RedirectionTree(object):
         :return:
         """
         timestamp = int(timestamp)
-        stack = [self.root]
+        stack = self.reset_dfs_stack()
         tar_node = None
         while stack:
             cur_node = stack.pop()
@@ -178,21 +196,30 @@ class RedirectionTree(object):
             --->G
             ->H
         Use DFS to traverse the tree.
+        The lines are buffered and written to stdout at once, which matters when dumping large trees to a log.
         :return:
         """
-        stack = [self.root]
+        indent_dict = dict()        # Key is the node depth, value is the corresponding indent prefix.
+        line_list = list()
+        stack = self.reset_dfs_stack()
         while stack:
             cur_node = stack.pop()
             if cur_node == self.root:
-                print("%s" % (cur_node.url + cur_node.url_fragment))
+                line_list.append(cur_node.url + cur_node.url_fragment)
             else:
-                print("--" * (cur_node.depth - 2) + "-> " + "%s (Type: %s; Method: %s; Timestamp: %s)" %
-                      (cur_node.url + cur_node.url_fragment, cur_node.resource_type, cur_node.parent_source, cur_node.timestamp))
+                depth = cur_node.depth
+                if depth not in indent_dict:
+                    indent_dict[depth] = "--" * (depth - 2) + "-> "
+                line_list.append(indent_dict[depth] + "%s (Type: %s; Method: %s; Timestamp: %s)" %
+                                 (cur_node.url + cur_node.url_fragment, cur_node.resource_type,
+                                  cur_node.parent_source, cur_node.timestamp))
 
             # Ensure that the earlier requested URLs are parsed first.
             for child in cur_node.children_list[::-1]:
                 stack += [child]
 
+        sys.stdout.write('\n'.join(line_list) + '\n')
+
     def get_leaves(self) -> list:
         """
         Get all the leaf nodes of the tree.
@@ -203,7 +230,7 @@ class RedirectionTree(object):
         :return:
         """
         leaf_node_list = list()
-        stack = [self.root]
+        stack = self.reset_dfs_stack()
         while stack:
             cur_node = stack.pop()
 
@@ -281,7 +308,7 @@ class RedirectionTree(object):
             end_url = end.lower()
 
         # Search the tree to get the Node object of start node and end node if the input parameter type is 'str'.
-        stack = [self.root]
+        stack = self.reset_dfs_stack()
         while stack:
             cur_node = stack.pop()
             cur_url = (cur_node.url + cur_node.url_fragment).lower()
@@ -290,7 +317,8 @@ class RedirectionTree(object):
             elif not end_node and cur_url == end_url:
                 end_node = cur_node
 
-            if not start_node and not end_node:
+            # Stop searching as soon as both endpoints are located.
+            if start_node and end_node:
                 break
 
             for child in cur_node.children_list[::-1]:
@@ -306,7 +334,7 @@ class RedirectionTree(object):
         # Backtrack from the given end node to get the corresponding request chain.
         cur_node = end_node
         while cur_node:     # None indicates still not getting the start node even though reaching the root.
-            intermediary_list += [cur_node]
+            intermediary_list.append(cur_node)
             if cur_node == start_node:
                 break
             cur_node = cur_node.parent
@@ -332,14 +360,14 @@ class RedirectionTree(object):
                           The timestamp of the initiator node must be earlier than the base node.
         :return:
         """
-        due_time = int(base_node.timestamp)
+        due_time = base_node.timestamp
 
         candidate_node_list = list()
-        stack = [self.root]
+        stack = self.reset_dfs_stack()
         while stack:
             cur_node = stack.pop()
             cur_node_url = cur_node.url  # Ignore the URL fragment.
-            if url_cmp(initiator_url, cur_node_url) and int(cur_node.timestamp) <= due_time:
+            if url_cmp(initiator_url, cur_node_url) and cur_node.timestamp <= due_time:
                 candidate_node_list += [cur_node]
             # Push the child nodes.
             for child in cur_node.children_list:
@@ -350,8 +378,7 @@ class RedirectionTree(object):
             # Select the closest one.
             initiator_node = candidate_node_list[0]
             for candidate in candidate_node_list[1:]:
-                candidate_time = int(candidate.timestamp)
-                if due_time - candidate_time < due_time - int(initiator_node.timestamp):
+                if due_time - candidate.timestamp < due_time - initiator_node.timestamp:
                     # Although the nodes in self-loop redirection share the same URL, they are different object.
                     if candidate == base_node:
                         continue
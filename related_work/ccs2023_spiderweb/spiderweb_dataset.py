@@ -7,14 +7,65 @@
 """
 
 import os
+import re
 
-from pprint import pprint
+from functools import lru_cache
 from urllib.parse import urlsplit
-from typing import Optional
+from typing import NamedTuple, Optional
 from publicsuffixlist import PublicSuffixList
 
 
 psl = PublicSuffixList(accept_unknown=False, only_icann=True)
+# Param name of each 'name=value' pair in a query string, i.e., everything before the first '=' of each '&'-separated part.
+PARAM_NAME_RE = re.compile(r'(?:^|&)([^=&]*)')
+
+
+class Webpage(NamedTuple):
+    """
+    Webpage-related params of a vertex.
+    Being a tuple, it is immutable and can be shared through the cache of 'get_webpage_params'.
+    """
+    url: str
+    domain: str
+    domain_len: int
+    tld: Optional[str]          # None if the domain is IP-format.
+    filename: str
+    params: str
+
+
+def split_url(url: str) -> tuple:
+    """
+    Split the given URL into netloc, path, and query, which are the only parts needed in this script.
+    Compared with 'urlsplit', locating the delimiters with 'str.find' is much faster for the plain
+        'scheme://netloc/path?query#fragment' URLs in the chains.
+    Other URLs (no '://', odd scheme, control characters or brackets) fall back to 'urlsplit'.
+    :param url:
+    :return: (netloc, path, query)
+    """
+    scheme_end = url.find('://')
+    scheme = url[:scheme_end]
+    if scheme_end > 0 and scheme.isascii() and scheme.isalpha() and \
+            '\t' not in url and '\r' not in url and '\n' not in url:
+        host_start = scheme_end + 3
+        # The netloc ends at the first '/', '?', or '#' after the scheme.
+        netloc_end = len(url)
+        for delimiter in '/?#':
+            pos = url.find(delimiter, host_start, netloc_end)
+            if pos != -1:
+                netloc_end = pos
+        netloc = url[host_start:netloc_end]
+        if '[' not in netloc and ']' not in netloc:
+            # The fragment is split off before the query, as 'urlsplit' does.
+            fragment_start = url.find('#', netloc_end)
+            if fragment_start == -1:
+                fragment_start = len(url)
+            query_start = url.find('?', netloc_end, fragment_start)
+            if query_start == -1:
+                return netloc, url[netloc_end:fragment_start], ''
+            return netloc, url[netloc_end:query_start], url[query_start + 1:fragment_start]
+
+    url_parts = urlsplit(url)
+    return url_parts.netloc, url_parts.path, url_parts.query
 
 
 def load_redirection_chains(sample: Optional[str] = None, label: Optional[str] = None) -> Optional[dict]:
@@ -41,9 +92,14 @@ def load_redirection_chains(sample: Optional[str] = None, label: Optional[str] =
     for sample_file in sample_file_list:
         if found:
             break
+        # Read the whole file at once and split it in C, instead of iterating the file object line by line.
+        # Split on '\n' only (not 'splitlines'), since URLs may contain other Unicode line boundaries.
         with open(sample_file, 'r', encoding='utf-8') as fr:
-            for line in fr:
-                line = line.strip('\n').split('\t')
+            line_list = fr.read().split('\n')
+            for line in line_list:
+                if not line:
+                    continue
+                line = line.split('\t')
                 cur_sample = line[0] + ':' + line[2]
                 chain = line[4].split(' ')
                 if sample:
@@ -62,27 +118,36 @@ def aggregate_chains(chain_dict: dict) -> dict:
     Aggregate the final URLs based on the similarity criterion used in the paper, namely 'Domain+Page+Parameters'.
     'Page' here indicates the file name of the Webpage.
     'Parameters' here indicates the param name in the URL.
+    The final URL is parsed by the cached 'get_webpage_params', so the graph construction reuses the same parse.
     :param chain_dict:
     :return: {rule1: [chain1, chain2, ...], rule2: [chain1, chain2, ...], ...}
     """
     final_groups = dict()
     for sample in chain_dict:
         chain = chain_dict[sample]
-        cur_final_url = chain[-1]
-        url_parts = urlsplit(cur_final_url)
-        domain = url_parts.netloc
-        page = url_parts.path.split('/')[-1]
-        params = ';'.join([p.split('=')[0] for p in url_parts.query.split('&')])
-        cur_rule = '%s+%s+%s' % (domain, page, params)
+        final_web_obj = get_webpage_params(chain[-1])
+        cur_rule = '%s+%s+%s' % (final_web_obj.domain, final_web_obj.filename, final_web_obj.params)
         if cur_rule in final_groups:
-            final_groups[cur_rule] += [chain]
+            final_groups[cur_rule].append(chain)
         else:
             final_groups[cur_rule] = [chain]
 
     return final_groups
 
 
-def get_webpage_params(url: str) -> list:
+@lru_cache(maxsize=None)
+def get_tld(domain: str) -> Optional[str]:
+    """
+    Get the TLD (public suffix) of the given domain.
+    Domains repeat massively across the redirection chains, so the lookups on the public suffix list are memoized.
+    :param domain:
+    :return: TLD, or None if the domain is IP-format.
+    """
+    return psl.publicsuffix(domain)
+
+
+@lru_cache(maxsize=200000)
+def get_webpage_params(url: str) -> Webpage:
     """
     Given a URL, extract the following params:
         1. URL;
@@ -91,20 +156,21 @@ def get_webpage_params(url: str) -> list:
         4. TLD;
         5. URL Filename;
         6. URL Params;
+    The same URL appears in many overlapping chains, so the results are cached.
+    Hence, the params are returned as an immutable Webpage to keep the shared cached result intact.
     :param url:
     :return:
     """
-    url_parts = urlsplit(url)
-    domain = url_parts.netloc
+    domain, path, query = split_url(url)
     # Ignore the explicitly introduced port.
     if ':' in domain:
         domain = domain.split(':')[0]
     domain_len = len(domain)
-    tld = psl.publicsuffix(domain)      # TLD is None if the domain is IP-format.
-    url_filename = url_parts.path.split('/')[-1]
-    url_params = ';'.join([p.split('=')[0] for p in url_parts.query.split('&')])
+    tld = get_tld(domain)      # TLD is None if the domain is IP-format.
+    url_filename = path.split('/')[-1]
+    url_params = ';'.join(PARAM_NAME_RE.findall(query))
 
-    return [url, domain, domain_len, tld, url_filename, url_params]
+    return Webpage(url, domain, domain_len, tld, url_filename, url_params)
 
 
 def construct_redirection_graph(chain_dict: dict) -> dict:
@@ -143,7 +209,7 @@ def construct_redirection_graph(chain_dict: dict) -> dict:
     graph_dict = dict()     # Key is the grouping rule, value is the corresponding graph.
     for rule in final_groups:
         vertex_idx = 0
-        url_vertex_dict = dict()        # Key is the URL, value if the corresponding vertex name.
+        url_vertex_dict = dict()        # Key is the URL, value is the corresponding [vertex name, webpage params].
         chain_obj_list = list()
         for node_list in final_groups[rule]:
             # A chain can be represented as [vertex_set, edge_set, ref_node, fin_node].
@@ -155,12 +221,13 @@ def construct_redirection_graph(chain_dict: dict) -> dict:
             ref_node, fin_node = None, None
             prior_vertex_name = None
             for i, node in enumerate(node_list):
-                web_obj = get_webpage_params(node)
-                cur_vertex_name = 'v' + str(vertex_idx)
-                if web_obj[0] in url_vertex_dict:
-                    cur_vertex_name = url_vertex_dict[web_obj[0]]
+                # Reuse the vertex (and its parsed params) if the URL has been seen in this group.
+                if node in url_vertex_dict:
+                    cur_vertex_name, web_obj = url_vertex_dict[node]
                 else:
-                    url_vertex_dict[web_obj[0]] = cur_vertex_name
+                    web_obj = get_webpage_params(node)
+                    cur_vertex_name = 'v' + str(vertex_idx)
+                    url_vertex_dict[node] = [cur_vertex_name, web_obj]
                     vertex_idx += 1
                 vertex_dict[cur_vertex_name] = web_obj
 
@@ -168,29 +235,32 @@ def construct_redirection_graph(chain_dict: dict) -> dict:
                     ref_node = cur_vertex_name
                 elif i > 0:
                     cur_edge = [prior_vertex_name, cur_vertex_name]
-                    edge_list += [cur_edge]
+                    edge_list.append(cur_edge)
                 if i == len(node_list) - 1:
                     fin_node = cur_vertex_name
 
                 prior_vertex_name = cur_vertex_name
 
             cur_chain_obj = [vertex_dict, edge_list, ref_node, fin_node]
-            chain_obj_list += [cur_chain_obj]
+            chain_obj_list.append(cur_chain_obj)
 
         # Construct the redirection graph.
         graph_chain_list = list()       # Distinct chain set (only consider the edge here).
         graph_vertex_dict = dict()      # Vertex set.
         graph_edge_list = list()        # Edge set.
+        graph_edge_seen = set()         # Speed up the membership check of the edge set.
         graph_referer_set = set()       # Referer set.
         graph_final_set = set()         # Final set.
         for cur_chain in chain_obj_list:
             graph_vertex_dict.update(cur_chain[0])
             chain_node_list = [cur_chain[1][0][0]]     # Initialize with the first node in the first edge.
             for edge in cur_chain[1]:
-                if edge not in graph_edge_list:
-                    graph_edge_list += [edge]
-                chain_node_list += [edge[1]]
-            graph_chain_list += [chain_node_list]
+                edge_key = (edge[0], edge[1])
+                if edge_key not in graph_edge_seen:
+                    graph_edge_seen.add(edge_key)
+                    graph_edge_list.append(edge)
+                chain_node_list.append(edge[1])
+            graph_chain_list.append(chain_node_list)
             graph_referer_set.add(cur_chain[2])
             graph_final_set.add(cur_chain[3])
 
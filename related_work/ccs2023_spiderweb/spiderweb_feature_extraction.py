@@ -23,6 +23,7 @@ Steps:
 
 import os
 
+from collections import Counter
 from urllib import parse
 from typing import Optional
 from publicsuffixlist import PublicSuffixList
@@ -44,8 +45,8 @@ def extract_tld_page_set(graph_dict: dict) -> tuple[dict, dict]:
         final_set = graph_dict[rule][5]
         vertex_dict = graph_dict[rule][2]
         for vertex in final_set:
-            tld = vertex_dict[vertex][3]
-            page = vertex_dict[vertex][4]
+            tld = vertex_dict[vertex].tld
+            page = vertex_dict[vertex].filename
             if tld in tld_dict:
                 tld_dict[tld] += 1
             else:
@@ -66,6 +67,7 @@ def extract_referer_features(tar_graph: list) -> list:
     :param tar_graph:
     :return:
     """
+    vertex_dict = tar_graph[2]
     distinct_chain_cnt = len(tar_graph[1])
     referer_set = tar_graph[4]
     f1 = len(referer_set) / distinct_chain_cnt
@@ -73,7 +75,7 @@ def extract_referer_features(tar_graph: list) -> list:
     referer_param_set = set()
     has_param_cnt = 0
     for referer in referer_set:
-        param = tar_graph[2][referer][5]
+        param = vertex_dict[referer].params
         if param:
             referer_param_set.add(param)
             has_param_cnt += 1
@@ -95,6 +97,7 @@ def extract_final_page_features(tar_graph: list) -> list:
     :param tar_graph:
     :return:
     """
+    vertex_dict = tar_graph[2]
     distinct_chain_cnt = len(tar_graph[1])
     final_set = tar_graph[5]
     f1 = len(final_set) / distinct_chain_cnt
@@ -105,17 +108,18 @@ def extract_final_page_features(tar_graph: list) -> list:
     page_name_set = set()
     is_ip_format = False
     for final in final_set:
-        param = tar_graph[2][final][5]
+        final_vertex = vertex_dict[final]
+        param = final_vertex.params
         if param:
             final_param_set.add(param)
             has_param_cnt += 1
 
-        tld = tar_graph[2][final][3]
+        tld = final_vertex.tld
         tld_set.add(tld)
         if not tld:
             is_ip_format = True
 
-        page_name = tar_graph[2][final][4]
+        page_name = final_vertex.filename
         page_name_set.add(page_name)
 
     f2 = len(final_param_set) / distinct_chain_cnt
@@ -139,47 +143,56 @@ def extract_graph_features(tar_graph: list) -> list:
     :param tar_graph:
     :return:
     """
-    max_chain_len = len(tar_graph[1][0])
-    min_chain_len = len(tar_graph[1][0])
+    vertex_dict = tar_graph[2]
+    chain_len_list = [len(chain) for chain in tar_graph[1]]
+    max_chain_len = max(chain_len_list)
+    min_chain_len = min(chain_len_list)
+
+    # Check the intra-domain redirection and the self-loop in one pass over the edges of each chain.
+    # Stop as soon as both of them are found.
     has_intra_dm_step = False
     has_self_loop = False
     for chain in tar_graph[1]:
-        if len(chain) > max_chain_len:
-            max_chain_len = len(chain)
-        if len(chain) < min_chain_len:
-            min_chain_len = len(chain)
-
-        # Check the intra-domain redirection.
         if has_intra_dm_step and has_self_loop:
-            continue
-        for i in range(1, len(chain)):
-            if not has_intra_dm_step and tar_graph[2][chain[i]][1] == tar_graph[2][chain[i-1]][1]:
+            break
+        prior_vertex = vertex_dict[chain[0]]
+        for vertex_name in chain[1:]:
+            cur_vertex = vertex_dict[vertex_name]
+            if cur_vertex.domain == prior_vertex.domain:
                 has_intra_dm_step = True
-            if not has_self_loop and tar_graph[2][chain[i]][0] == tar_graph[2][chain[i-1]][0]:
+            if cur_vertex.url == prior_vertex.url:
                 has_self_loop = True
+            if has_intra_dm_step and has_self_loop:
+                break
+            prior_vertex = cur_vertex
 
     # Check the 30% and 80% hub.
     # Note that, hub should be the intermediary or the start node, not the end node.
     has_hub_30, has_hub_80 = False, False
-    if len(tar_graph[1]) >= 5:      # Filter the small-scale graph.
-        vertex_freq_dict = dict()
-        for vertex in tar_graph[2]:
-            if vertex in tar_graph[5]:      # Ignore the final node.
-                continue
-            for chain in tar_graph[1]:
-                if vertex in chain:
-                    if vertex in vertex_freq_dict:
-                        vertex_freq_dict[vertex] += 1
-                    else:
-                        vertex_freq_dict[vertex] = 1
-        for vertex in vertex_freq_dict:
-            if has_hub_80 and has_hub_30:
+    chain_cnt = len(tar_graph[1])
+    if chain_cnt >= 5:      # Filter the small-scale graph.
+        # Scale the thresholds by 10 to compare the counts in exact integers.
+        # (e.g., 0.3 * 10 chains is 3.0000000000000004 in floating point, which would miss a count of 3.)
+        hub_30_threshold = 3 * chain_cnt
+        hub_80_threshold = 8 * chain_cnt
+        # Count the number of chains passing through each vertex by walking each chain once.
+        # Stop counting as soon as a vertex reaches 80%, since both hubs are found then.
+        final_set = tar_graph[5]
+        vertex_freq_dict = Counter()
+        for chain in tar_graph[1]:
+            for vertex in set(chain):
+                if vertex not in final_set:      # Ignore the final node.
+                    vertex_freq_dict[vertex] += 1
+                    if 10 * vertex_freq_dict[vertex] >= hub_80_threshold:
+                        has_hub_80 = True
+            if has_hub_80:
                 break
-            if not has_hub_80 and vertex_freq_dict[vertex] / len(tar_graph[1]) >= 0.8:
-                has_hub_80 = True
-                has_hub_30 = True
-            elif not has_hub_30 and vertex_freq_dict[vertex] / len(tar_graph[1]) >= 0.3:
-                has_hub_30 = True
+        # A hub exists iff the most frequent vertex reaches the threshold.
+        if has_hub_80:
+            has_hub_30 = True
+        else:
+            max_freq = max(vertex_freq_dict.values(), default=0)
+            has_hub_30 = 10 * max_freq >= hub_30_threshold
 
     return [max_chain_len, min_chain_len, int(has_intra_dm_step), int(has_hub_30), int(has_hub_80), int(has_self_loop)]
 
@@ -210,51 +223,22 @@ def extract_features() -> tuple[list, list]:
     benign_graph_dict = construct_redirection_graph(benign_chain_dict)
     m_tld_dict, m_page_dict = extract_tld_page_set(malicious_graph_dict)
     b_tld_dict, b_page_dict = extract_tld_page_set(benign_graph_dict)
-    tld_dict, page_dict = dict(), dict()
-    total_tld_freq, total_page_freq = 0, 0
-    for tld in m_tld_dict:
-        if tld in tld_dict:
-            tld_dict[tld] += m_tld_dict[tld]
-        else:
-            tld_dict[tld] = m_tld_dict[tld]
-        total_tld_freq += m_tld_dict[tld]
-    for tld in b_tld_dict:
-        if tld in tld_dict:
-            tld_dict[tld] += b_tld_dict[tld]
-        else:
-            tld_dict[tld] = b_tld_dict[tld]
-        total_tld_freq += b_tld_dict[tld]
-    for page in m_page_dict:
-        if page in page_dict:
-            page_dict[page] += m_page_dict[page]
-        else:
-            page_dict[page] = m_page_dict[page]
-        total_page_freq += m_page_dict[page]
-    for page in b_page_dict:
-        if page in page_dict:
-            page_dict[page] += b_page_dict[page]
-        else:
-            page_dict[page] = b_page_dict[page]
-        total_page_freq += b_page_dict[page]
+    # Merge the malicious and benign frequencies (all counts are positive, so Counter addition keeps every key).
+    tld_dict = Counter(m_tld_dict) + Counter(b_tld_dict)
+    page_dict = Counter(m_page_dict) + Counter(b_page_dict)
+    total_tld_freq = sum(tld_dict.values())
+    total_page_freq = sum(page_dict.values())
 
     m_sample_features_list, b_sample_features_list = list(), list()
 
-    for m_rule in malicious_graph_dict:
-        cur_m_features = get_sample_features(malicious_graph_dict[m_rule])
-        # Modify the TLD (f7) and page name (f8) features of malicious samples.
-        f7 = sum([tld_dict[tld] for tld in cur_m_features[6]]) / total_tld_freq
-        f8 = sum([page_dict[page] for page in cur_m_features[7]]) / total_page_freq
-        cur_m_features[6] = f7
-        cur_m_features[7] = f8
-        m_sample_features_list += [cur_m_features]
-    for b_rule in benign_graph_dict:
-        cur_b_features = get_sample_features(benign_graph_dict[b_rule])
-        # Modify the TLD (f6) and page name (f7) features of benign samples.
-        f7 = sum([tld_dict[tld] for tld in cur_b_features[6]]) / total_tld_freq
-        f8 = sum([page_dict[page] for page in cur_b_features[7]]) / total_page_freq
-        cur_b_features[6] = f7
-        cur_b_features[7] = f8
-        b_sample_features_list += [cur_b_features]
+    for graph_dict, sample_features_list in ((malicious_graph_dict, m_sample_features_list),
+                                             (benign_graph_dict, b_sample_features_list)):
+        for rule in graph_dict:
+            cur_features = get_sample_features(graph_dict[rule])
+            # Modify the TLD (f7) and page name (f8) features.
+            cur_features[6] = sum(tld_dict[tld] for tld in cur_features[6]) / total_tld_freq
+            cur_features[7] = sum(page_dict[page] for page in cur_features[7]) / total_page_freq
+            sample_features_list.append(cur_features)
 
     return m_sample_features_list, b_sample_features_list
 
@@ -14,31 +14,30 @@ import matplotlib.pyplot as plt
 
 from pprint import pprint
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_curve, auc
 
 
-def load_data(file_path: str) -> list:
+def load_data(file_path: str) -> np.ndarray:
     """
     Given the file path of the labeled samples, load the sample features.
+    Each line is [sample, label, feature_1, feature_2, ..., feature_n], separated by tabs.
+    Parse the file with numpy in one go instead of splitting and converting line by line.
     :param file_path:
-    :return:
+    :return: Feature matrix, one row per sample.
     """
-    feature_list = list()
-    with open(file_path, 'r', encoding='utf-8') as fr:
-        for line in fr:
-            line = line.strip('\n').split('\t')
-            sample, label = line[0], line[1]
-            features = [float(i) for i in line[2:]]
-            feature_list += [features]
-    return feature_list
+    item_array = np.loadtxt(file_path, dtype=str, delimiter='\t', comments=None, encoding='utf-8', ndmin=2)
+    feature_array = item_array[:, 2:].astype(float)
+    return feature_array
 
 
-def construct_train_test_data(m_split_ratio: float = 0.9, b_split_ratio: float = 0.9) -> (list, list, list, list):
+def construct_train_test_data(split_ratio: float = 0.9) -> (list, list, list, list):
     """
     Load sample data from the built malicious and benign sample files.
     Split the data into training set and test set.
-    :param m_split_ratio: Split ratio of malicious samples.
-    :param b_split_ratio: Split ratio of benign samples.
+    The samples are stacked once and then shuffled and split in one pass, stratified by label,
+        so that both sets keep the malicious/benign proportion.
+    :param split_ratio: Split ratio of the training set.
     :return:
     """
     m_sample_file = r'./data/hmg_malicious_samples.txt'
@@ -47,37 +46,22 @@ def construct_train_test_data(m_split_ratio: float = 0.9, b_split_ratio: float =
     m_feature_list = load_data(m_sample_file)
     print('Loading benign samples [%s] ...' % b_sample_file)
     b_feature_list = load_data(b_sample_file)
-    m_label_list = [1] * len(m_feature_list)
-    b_label_list = [0] * len(b_feature_list)
-
-    m_feature_list = np.array(m_feature_list)
-    b_feature_list = np.array(b_feature_list)
-    m_label_list = np.array(m_label_list)
-    b_label_list = np.array(b_label_list)
-
-    # Shuffle the samples.
-    np.random.seed(20)
-    m_shuffle_indices = np.random.permutation(np.arange(len(m_feature_list)))
-    b_shuffle_indices = np.random.permutation(np.arange(len(b_feature_list)))
-    m_shuffled_features = m_feature_list[m_shuffle_indices]
-    m_shuffled_labels = m_label_list[m_shuffle_indices]
-    b_shuffled_features = b_feature_list[b_shuffle_indices]
-    b_shuffled_labels = b_label_list[b_shuffle_indices]
-
-    m_split_idx = int(m_split_ratio * len(m_shuffled_features))
-    b_split_idx = int(b_split_ratio * len(b_shuffled_features))
 
+    feature_list = np.vstack((m_feature_list, b_feature_list))
+    label_list = np.concatenate((np.ones(len(m_feature_list), dtype=int), np.zeros(len(b_feature_list), dtype=int)))
+
+    # Shuffle and split the samples.
+    x_train_list, x_test_list, y_train_list, y_test_list = train_test_split(
+        feature_list, label_list, train_size=split_ratio, stratify=label_list, random_state=20)
+
+    m_train_cnt = int(np.count_nonzero(y_train_list))
+    m_test_cnt = int(np.count_nonzero(y_test_list))
     print('Training set:')
-    print('    - Malicious: %d' % m_split_idx)
-    print('    - Benign: %d' % b_split_idx)
+    print('    - Malicious: %d' % m_train_cnt)
+    print('    - Benign: %d' % (len(y_train_list) - m_train_cnt))
     print('Test set:')
-    print('    Malicious: %d' % (len(m_shuffled_features) - m_split_idx))
-    print('    Benign: %d' % (len(b_shuffled_features) - b_split_idx))
-
-    x_train_list = np.concatenate((m_shuffled_features[:m_split_idx], b_shuffled_features[:b_split_idx]), axis=0)
-    y_train_list = np.concatenate((m_shuffled_labels[:m_split_idx], b_shuffled_labels[:b_split_idx]), axis=0)
-    x_test_list = np.concatenate((m_shuffled_features[m_split_idx:], b_shuffled_features[b_split_idx:]), axis=0)
-    y_test_list = np.concatenate((m_shuffled_labels[m_split_idx:], b_shuffled_labels[b_split_idx:]), axis=0)
+    print('    Malicious: %d' % m_test_cnt)
+    print('    Benign: %d' % (len(y_test_list) - m_test_cnt))
 
     return x_train_list, y_train_list, x_test_list, y_test_list
 
@@ -89,18 +73,13 @@ def hmg_model() -> None:
     """
     x_train, y_train, x_test, y_test = construct_train_test_data()
 
-    np.random.seed(20)
-    train_shuffle_indices = np.random.permutation(np.arange(len(x_train)))
-    test_shuffle_indices = np.random.permutation(np.arange(len(x_test)))
-    x_train, y_train = x_train[train_shuffle_indices], y_train[train_shuffle_indices]
-    x_test, y_test = x_test[test_shuffle_indices], y_test[test_shuffle_indices]
-
-    # Train the random forest model.
-    rf_clf = RandomForestClassifier()
+    # Train the random forest model on all cores, seeded like the data split.
+    rf_clf = RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=20)
     rf_clf.fit(x_train, y_train)
-    rf_y_predict = rf_clf.predict(x_test)
-    rf_acc = np.mean(y_test == rf_y_predict)
+    # Derive the predicted labels from the probabilities (as 'predict' does) to traverse the trees only once.
     y_predict_prob = rf_clf.predict_proba(x_test)
+    rf_y_predict = rf_clf.classes_[np.argmax(y_predict_prob, axis=1)]
+    rf_acc = np.mean(y_test == rf_y_predict)
     fp, tp, threshold = roc_curve(y_test, y_predict_prob[:, 1], pos_label=1)
 
     print('HMG ACC:', rf_acc)
@@ -117,12 +96,8 @@ def hmg_model() -> None:
     plt.show()
 
     hmg_roc_file = r'./data/hmg_roc.txt'
-    roc_str = ''
-    for i in range(fp.shape[0]):
-        temp_str = str(fp[i]) + '\t' + str(tp[i]) + '\t' + str(threshold[i]) + '\n'
-        roc_str += temp_str
     with open(hmg_roc_file, 'w') as fw:
-        fw.write(roc_str)
+        fw.writelines(str(fp[i]) + '\t' + str(tp[i]) + '\t' + str(threshold[i]) + '\n' for i in range(fp.shape[0]))
 
 
 if __name__ == "__main__":
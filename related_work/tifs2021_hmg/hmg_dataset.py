@@ -7,8 +7,13 @@
 """
 
 import os
+import shelve
+import hashlib
+import multiprocessing
 import hmg_feature_extraction as hmg_fe
 
+from typing import Optional
+
 
 def collect_samples() -> (list, list):
     """
@@ -63,36 +68,93 @@ def collect_samples() -> (list, list):
     return malicious_sample_path_list, benign_sample_path_list
 
 
-def dump_sample_features(sample_path_list: list, saved_file: str, label: str) -> int:
+def process_sample(sample_item: tuple, label: str) -> Optional[list]:
+    """
+    Extract the HMG features of a single sample based on its performance log.
+    :param sample_item: (sample_name, sample_path)
+    :param label:
+    :return: [sample, label, feature_1, feature_2, ..., feature_n], or None if the HMG has no more than one node.
+    """
+    log_path = os.path.join(sample_item[1], 'performance_log.txt')
+    node_list, edge_list, host_sns_dict = hmg_fe.parse_sample(log_path)
+    if len(node_list) <= 1:
+        return None
+    feature_list = hmg_fe.get_hmg_features(node_list, edge_list, host_sns_dict)
+    item = [sample_item[0], label] + feature_list
+
+    return item
+
+
+def get_feature_version() -> str:
+    """
+    Get the version of the feature extraction, namely the hash of the source code that produces the sample features.
+    Any change of the feature extraction changes the version, and hence invalidates the cached features.
+    :return:
+    """
+    md5 = hashlib.md5()
+    for source_file in [hmg_fe.__file__, __file__]:
+        with open(source_file, 'rb') as fr:
+            md5.update(fr.read())
+    return md5.hexdigest()
+
+
+def get_sample_cache_key(sample_item: tuple, label: str, feature_version: str) -> str:
+    """
+    Build the feature cache key of a sample.
+    The key changes whenever its performance log or the feature extraction is modified.
+    :param sample_item: (sample_name, sample_path)
+    :param label:
+    :param feature_version: Returned by 'get_feature_version'.
+    :return: 'feature_version|sample|label|log_path|mtime|size'
+    """
+    log_path = os.path.join(sample_item[1], 'performance_log.txt')
+    log_stat = os.stat(log_path)
+    return '%s|%s|%s|%s|%d|%d' % (feature_version, sample_item[0], label, log_path,
+                                  log_stat.st_mtime_ns, log_stat.st_size)
+
+
+def dump_sample_features(sample_path_list: list, saved_file: str, label: str, cache_dir: str = './.hmg_cache') -> int:
     """
     Given the samples, extracting the HMG features based on the corresponding performance logs.
+    The features of each sample are cached on disk, keyed by the mtime and size of its performance log
+        and the version of the feature extraction, so that only the new or modified samples
+        are processed again in later runs.
+    The uncached samples are independent, so they are processed in parallel by a process pool.
+    The results are gathered (in the sample order) and saved by the main process only.
     :param sample_path_list: [[sample_name, sample_path], ...]
     :param saved_file:
     :param label:
+    :param cache_dir: Directory of the feature cache.
     :return: The number of valid saved samples.
     """
+    os.makedirs(cache_dir, exist_ok=True)
+    with shelve.open(os.path.join(cache_dir, 'sample_features')) as cache:
+        feature_version = get_feature_version()
+        key_list = [get_sample_cache_key(sample_item, label, feature_version) for sample_item in sample_path_list]
+        missed_idx_list = [i for i, key in enumerate(key_list) if key not in cache]
+        print('Cached samples: %d, uncached samples: %d' % (len(key_list) - len(missed_idx_list), len(missed_idx_list)))
+
+        if missed_idx_list:
+            with multiprocessing.Pool() as pool:
+                missed_result_list = pool.starmap(process_sample,
+                                                  [(sample_path_list[i], label) for i in missed_idx_list],
+                                                  chunksize=8)
+            # Also cache the invalid samples (None), so that they are skipped in later runs.
+            for i, item in zip(missed_idx_list, missed_result_list):
+                cache[key_list[i]] = item
+
+        result_list = [cache[key] for key in key_list]
+
     item_list = list()
-    for i, sample_item in enumerate(sample_path_list):
-        log_path = os.path.join(sample_item[1], 'performance_log.txt')
-        pair_list = hmg_fe.extract_request_response_pairs(log_path)
-        node_list = hmg_fe.construct_nodes(pair_list)
-        if len(node_list) <= 1:
+    for item in result_list:
+        if item is None:
             continue
-        edge_list = hmg_fe.construct_edges(node_list)
-        hmg = hmg_fe.construct_graph(node_list, edge_list)
-        feature_list = hmg_fe.get_hmg_features(node_list, edge_list, hmg)
-        # [sample, label, feature_1, feature_2, ..., feature_n]
-        item = [sample_item[0], label] + feature_list
-        item_list += [item]
+        item_list.append(item)
         print(item)
 
-    # Save the sample features.
-    saved_str = ''
-    for item in item_list:
-        item_str = '\t'.join([str(i) for i in item]) + '\n'
-        saved_str += item_str
+    # Save the sample features line by line, without building the whole file content in memory.
     with open(saved_file, 'w', encoding='utf-8') as fw:
-        fw.write(saved_str)
+        fw.writelines('\t'.join(map(str, item)) + '\n' for item in item_list)
 
     return len(item_list)
 
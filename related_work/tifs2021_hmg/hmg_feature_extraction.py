@@ -19,13 +19,68 @@ Steps:
 
 
 import os
+import ast
 import json
+import numpy as np
 import networkx as nx
 
+from collections import defaultdict, deque
+from functools import lru_cache
 from urllib import parse
 from publicsuffixlist import PublicSuffixList
 
 
+psl = PublicSuffixList(accept_unknown=False, only_icann=True)
+# HMGs with at most this number of nodes (most samples) compute the centrality without building the 'networkx' graph.
+SMALL_GRAPH_SIZE = 20
+
+
+@lru_cache(maxsize=8192)
+def get_e2ld(host: str) -> str:
+    """
+    Get the e2LD (private suffix) of the given host.
+    The same hosts are requested over and over in a sample, so the lookups on the public suffix list are memoized.
+    :param host:
+    :return: e2LD, or None if the host is IP-format or has an invalid suffix.
+    """
+    return psl.privatesuffix(host)
+
+
+@lru_cache(maxsize=16384)
+def parse_url(url: str) -> parse.ParseResult:
+    """
+    Memoized 'urlparse', since the same resources are requested repeatedly.
+    The result is an immutable named tuple, so it is safe to share from the cache.
+    :param url:
+    :return:
+    """
+    return parse.urlparse(url)
+
+
+@lru_cache(maxsize=16384)
+def join_url(base_url: str, url: str) -> str:
+    """
+    Memoized 'urljoin', used to resolve the relative 'Location' of 30X redirections.
+    :param base_url:
+    :param url:
+    :return:
+    """
+    return parse.urljoin(base_url, url)
+
+
+def load_log_entry(line: str) -> dict:
+    """
+    Parse a line of the performance log into the entry dict.
+    Newer logs are dumped as JSON, which is parsed by the C-accelerated 'json' module.
+    Older logs are dumped as the Python repr of the entry, which is parsed by 'ast.literal_eval' instead of 'eval'.
+    :param line:
+    :return:
+    """
+    if line.startswith('{"'):
+        return json.loads(line)
+    return ast.literal_eval(line)
+
+
 def extract_request_response_pairs(log_path: str) -> list:
     """
     Extract request-response pairs from the performance log.
@@ -35,12 +90,16 @@ def extract_request_response_pairs(log_path: str) -> list:
     :return:
     """
     target_method_set = {'Network.requestWillBeSent', 'Network.responseReceived'}
-    request_id_dict = dict()        # Key is requestId, value is the entry list.
+    request_id_dict = defaultdict(list)     # Key is requestId, value is the entry list.
 
-    with open(log_path, 'r', encoding='utf-8') as fr:
+    # Read the log in binary with a large buffer, and skip the lines of other methods before decoding and parsing them.
+    # Most entries of the performance log are neither 'requestWillBeSent' nor 'responseReceived'.
+    with open(log_path, 'rb', buffering=1 << 20) as fr:
         for i, line in enumerate(fr):
-            line = line.strip('\n')
-            line_entry_dict = eval(line)
+            if b'Network.requestWillBeSent' not in line and b'Network.responseReceived' not in line:
+                continue
+            line = line.rstrip(b'\r\n').decode('utf-8')
+            line_entry_dict = load_log_entry(line)
             method_dict = json.loads(line_entry_dict['message'])
             message_dict = method_dict['message']
 
@@ -49,19 +108,13 @@ def extract_request_response_pairs(log_path: str) -> list:
 
             message_dict['timestamp'] = line_entry_dict['timestamp']
             cur_id = message_dict['params']['requestId']
-            if cur_id in request_id_dict:
-                request_id_dict[cur_id] += [message_dict]
-            else:
-                request_id_dict[cur_id] = [message_dict]
-
-    items_list = list()
-    for cur_id in request_id_dict:
-        items_list += [request_id_dict[cur_id][:]]
+            request_id_dict[cur_id].append(message_dict)
 
-    return items_list
+    # The entry lists are not used elsewhere, so return them directly instead of copies.
+    return list(request_id_dict.values())
 
 
-def construct_nodes(items_list: list) -> list:
+def construct_nodes(items_list: list) -> (list, dict, dict):
     """
     Given the request items, convert them into graph nodes.
     Each node is represented as: N= [SN, URL, Referer, Host, Method, Location, StatusCode].
@@ -72,11 +125,10 @@ def construct_nodes(items_list: list) -> list:
         1. Mostly, a request entry and a response entry;
         2. Only a request entry, which is always caused by insufficient waiting time.
         3. Many request entries, which is caused by repeatedly requesting the same resources or 30X redirection.
+    Also index the nodes by URL and by host, which are used to construct the edges and extract the features.
     :param items_list:
-    :return:
+    :return: node_list, url_sns_dict ({url: [SN1, SN2, ...]}), host_sns_dict ({host: [SN1, SN2, ...]})
     """
-    psl = PublicSuffixList(accept_unknown=False, only_icann=True)
-
     node_list = list()
     node_sn = 0
     for items in items_list:
@@ -88,15 +140,13 @@ def construct_nodes(items_list: list) -> list:
             request = items[0]
             timestamp = request['timestamp']
             url = request['params']['request']['url']
-            host = parse.urlparse(url).netloc
+            host = parse_url(url).netloc
             # Filter the invalid domains.
-            e2ld = psl.privatesuffix(host)
+            e2ld = get_e2ld(host)
             if not host or not e2ld:
                 continue
             method = request['params']['request']['method']
-            referer = None
-            if 'Referer' in request['params']['request']['headers']:
-                referer = request['params']['request']['headers']['Referer']
+            referer = request['params']['request']['headers'].get('Referer')
             location = None
             status_code = 200
 
@@ -114,14 +164,12 @@ def construct_nodes(items_list: list) -> list:
                     request = item
                     timestamp = request['timestamp']
                     url = request['params']['request']['url']
-                    host = parse.urlparse(url).netloc
-                    e2ld = psl.privatesuffix(host)
+                    host = parse_url(url).netloc
+                    e2ld = get_e2ld(host)
                     if not host or not e2ld:
                         continue
                     method = request['params']['request']['method']
-                    referer = None
-                    if 'Referer' in request['params']['request']['headers']:
-                        referer = request['params']['request']['headers']['Referer']
+                    referer = request['params']['request']['headers'].get('Referer')
                     location = None
                     status_code = 200
 
@@ -142,24 +190,26 @@ def construct_nodes(items_list: list) -> list:
                             # Whether the next entry is a 'redirectResponse' request.
                             if 'redirectResponse' in items[i + 1]['params']:
                                 redirect_request = items[i + 1]
-                                # The field maybe 'Location' or 'location'.
-                                if 'location' in redirect_request['params']['redirectResponse']['headers']:
-                                    location = redirect_request['params']['redirectResponse']['headers']['location']
-                                elif 'Location' in redirect_request['params']['redirectResponse']['headers']:
-                                    location = redirect_request['params']['redirectResponse']['headers']['Location']
-                                elif 'LOCATION' in redirect_request['params']['redirectResponse']['headers']:
-                                    location = redirect_request['params']['redirectResponse']['headers']['LOCATION']
-                                location = parse.urljoin(url, location)
+                                # The field may be in any case, e.g., 'Location', 'location', or 'LOCATION'.
+                                redirect_headers = redirect_request['params']['redirectResponse']['headers']
+                                location = {key.lower(): value for key, value in redirect_headers.items()}.get('location')
+                                location = join_url(url, location)
                                 status_code = redirect_request['params']['redirectResponse']['status']
 
                     cur_node = [node_sn, url, referer, host, method, location, status_code]
                     node_list += [cur_node]
                     node_sn += 1
 
-    return node_list
+    url_sns_dict = defaultdict(list)        # Some nodes may have the same URL, namely requesting the same resource.
+    host_sns_dict = defaultdict(list)
+    for node in node_list:
+        url_sns_dict[node[1]].append(node[0])
+        host_sns_dict[node[3]].append(node[0])
+
+    return node_list, url_sns_dict, host_sns_dict
 
 
-def construct_edges(node_list: list) -> list:
+def construct_edges(node_list: list, url_sns_dict: dict) -> list:
     """
     Given the node list, construct the edges based on the 'Referer' and 'Location' fields of nodes.
     Each edge is represented as: E = [N_s, N_d, Type].
@@ -168,37 +218,44 @@ def construct_edges(node_list: list) -> list:
         - Use SN to indicate the corresponding node, e.g., [2, 3, Referer] means a Referer edge pointing from 2 to 3.
         - Edge must point from the node with small SN to the node with big SN.
     :param node_list:
+    :param url_sns_dict: Nodes indexed by URL, built by 'construct_nodes'.
     :return:
     """
-    # Construct a dictionary to speed up the lookup.
-    url_nodes_dict = dict()     # Some nodes may have the same URL, namely requesting the same resource.
-    for node in node_list:
-        url = node[1]
-        if url in url_nodes_dict:
-            url_nodes_dict[url] += [node]
-        else:
-            url_nodes_dict[url] = [node]
-
     edge_list = list()
     # Find parent nodes.
     for node in node_list:
         # Check 'Location' field.
         location = node[-2]
-        if location and location in url_nodes_dict:
-            son_node = url_nodes_dict[location][0]
-            if node[0] < son_node[0]:       # Make Sure the SN order.
-                location_edge = [node[0], son_node[0], 'location']
+        if location and location in url_sns_dict:
+            son_node_sn = url_sns_dict[location][0]
+            if node[0] < son_node_sn:       # Make Sure the SN order.
+                location_edge = [node[0], son_node_sn, 'location']
                 edge_list += [location_edge]
         # Check 'Referer' field.
         referer = node[2]
-        if referer and referer in url_nodes_dict:
-            for parent_node in url_nodes_dict[referer]:
-                if parent_node[0] < node[0]:        # Make Sure the SN order.
-                    referer_edge = [parent_node[0], node[0], 'referer']
+        if referer and referer in url_sns_dict:
+            for parent_node_sn in url_sns_dict[referer]:
+                if parent_node_sn < node[0]:        # Make Sure the SN order.
+                    referer_edge = [parent_node_sn, node[0], 'referer']
                     edge_list += [referer_edge]
     return edge_list
 
 
+def parse_sample(log_path: str) -> (list, list, dict):
+    """
+    Parse the performance log of a sample into the HMG nodes and edges.
+    This is the single entry point of the parsing stage (log parsing, node construction, and edge construction),
+        whose outputs are plain lists and dicts, so that the stage can be swapped or parallelized as a whole.
+    :param log_path:
+    :return: node_list, edge_list, host_sns_dict
+    """
+    pair_list = extract_request_response_pairs(log_path)
+    node_list, url_sns_dict, host_sns_dict = construct_nodes(pair_list)
+    edge_list = construct_edges(node_list, url_sns_dict)
+
+    return node_list, edge_list, host_sns_dict
+
+
 def construct_graph(node_list: list, edge_list: list) -> nx.DiGraph:
     """
     Given the node list and edge list, construct the HMG based on the networkx library.
@@ -229,8 +286,6 @@ def get_node_features(node_list: list) -> list:
     :param node_list:
     :return:
     """
-    psl = PublicSuffixList(accept_unknown=False, only_icann=True)
-
     # F1
     node_cnt = len(node_list)
 
@@ -248,9 +303,9 @@ def get_node_features(node_list: list) -> list:
         if referer:
             referer_cnt += 1
         # F4
+        # Note that, 'construct_nodes' drops the hosts without e2LD, so no IP host reaches here and F4 is always 0.
         host = node[3]
-        e2ld = psl.privatesuffix(host)
-        if not e2ld and len(host.split('.')) == 4:      # Check whether the hostname is an IP address.
+        if not get_e2ld(host) and len(host.split('.')) == 4:      # Check whether the hostname is an IP address.
             ip_cnt += 1
         # F5
         method = node[4]
@@ -271,30 +326,17 @@ def get_edge_features(node_list: list, edge_list: list) -> list:
         1. F1: The number of 30X redirection edges;
         2. F2: The number of 30X redirection edges that connecting two nodes with different domains;
         3. F3: Length of the longest 30X redirection chain.
-    :param node_list:
+    :param node_list: The node with SN i is node_list[i], as constructed by 'construct_nodes'.
     :param edge_list:
     :return:
     """
+    # Collect the redirection edges, and index them by start SN to speed up the lookup of redirection path.
     redirect_edge_list = list()
-    involved_sn_set = set()
+    next_sn_dict = dict()       # Key is the start SN of a redirection edge, value is its end SN.
     for edge in edge_list:
         if edge[-1] == 'location':
-            redirect_edge_list += [edge]
-            involved_sn_set.add(edge[0])
-            involved_sn_set.add(edge[1])
-    sn_node_dict = dict()
-    for node in node_list:
-        sn = node[0]
-        if sn in involved_sn_set:
-            sn_node_dict[sn] = node[:]
-            involved_sn_set.remove(sn)
-        if not len(involved_sn_set):
-            break
-
-    # Speed up the lookup of redirection path.
-    start_sn_dict = dict()      # key is start SN of and edge, value is the edge.
-    for edge in redirect_edge_list:
-        start_sn_dict[edge[0]] = edge[:]
+            redirect_edge_list.append(edge)
+            next_sn_dict[edge[0]] = edge[1]
 
     # F1
     redirect_cnt = len(redirect_edge_list)
@@ -302,55 +344,232 @@ def get_edge_features(node_list: list, edge_list: list) -> list:
     # F2, F3
     cross_domain_cnt = 0
     max_path_len = 0
+    hop_cnt_dict = dict()       # Key is SN, value is the number of redirection hops starting from it.
     for edge in redirect_edge_list:
         # F2
         sn1, sn2 = edge[0], edge[1]
-        node1, node2 = sn_node_dict[sn1], sn_node_dict[sn2]
-        if node1[3] != node2[3]:
+        if node_list[sn1][3] != node_list[sn2][3]:
             cross_domain_cnt += 1
         # F3
-        path_len = 1
-        while sn1 in start_sn_dict:
-            path_len += 1
-            sn1 = start_sn_dict[sn1][1]
+        # Walk the redirection path only until reaching a node whose hop count is known,
+        #   then record the hop count of each newly walked node, so that each node is walked once in total.
+        path_sn_list = list()
+        cur_sn = sn1
+        while cur_sn in next_sn_dict and cur_sn not in hop_cnt_dict:
+            path_sn_list.append(cur_sn)
+            cur_sn = next_sn_dict[cur_sn]
+        hop_cnt = hop_cnt_dict.get(cur_sn, 0)
+        for sn in reversed(path_sn_list):
+            hop_cnt += 1
+            hop_cnt_dict[sn] = hop_cnt
+        path_len = 1 + hop_cnt_dict[sn1]
         max_path_len = max(path_len, max_path_len)
 
     return [redirect_cnt, cross_domain_cnt, max_path_len]
 
 
-def get_graph_features(node_list: list, edge_list: list, hmg: nx.DiGraph) -> list:
+def find_root(parent_sn_list: list, sn: int) -> int:
+    """
+    Find the root of the given node in the union-find forest, halving the path along the way.
+    :param parent_sn_list: The parent SN of each node.
+    :param sn:
+    :return: The SN of the root.
     """
-    Given the constructed directed graph HMG, extract the following three features:
+    while parent_sn_list[sn] != sn:
+        parent_sn_list[sn] = parent_sn_list[parent_sn_list[sn]]
+        sn = parent_sn_list[sn]
+    return sn
+
+
+def get_graph_features(node_list: list, edge_list: list) -> list:
+    """
+    Given the nodes and edges of HMG, extract the following three features:
         1. F1: Length of the longest path in HMG;
-        2. F2: Number of the connected components in HMG;
+        2. F2: Number of the (weakly) connected components in HMG;
         3. F3: Ratio of the isolated nodes in HMG.
-    Here, employ the 3rd party Python library 'networkx' to construct the directed graph.
+    The nodes are indexed by SN, so the features are computed directly on the node and edge lists,
+        without traversing the 'networkx' graph.
     :param node_list:
     :param edge_list:
-    :param hmg:
     :return:
     """
-    for node in node_list:
-        hmg.add_node(node[0],
-                     url=node[1], referer=node[2], host=node[3],
-                     method=node[4], location=node[5], status_code=node[6])
-    for edge in edge_list:
-        hmg.add_edge(edge[0], edge[1], edge_type=edge[2])
-
     # F1
-    longest_path_len = nx.dag_longest_path_length(hmg)
+    # Every edge points from the node with small SN to the node with big SN, so the SN order is a topological order.
+    # Hence, the longest path ending at each node is computed in a single DP pass in SN order.
+    pred_sns_list = [list() for _ in range(len(node_list))]
+    for edge in edge_list:
+        pred_sns_list[edge[1]].append(edge[0])
+    path_len_list = [0] * len(node_list)        # Length of the longest path ending at each node.
+    for sn, pred_sns in enumerate(pred_sns_list):
+        for pred_sn in pred_sns:
+            if path_len_list[pred_sn] + 1 > path_len_list[sn]:
+                path_len_list[sn] = path_len_list[pred_sn] + 1
+    longest_path_len = max(path_len_list, default=0)
 
     # F2
-    component_cnt = nx.number_weakly_connected_components(hmg)
+    # Union the two ends of each edge, then each remaining root represents a weakly connected component.
+    parent_sn_list = list(range(len(node_list)))
+    has_edge_list = [False] * len(node_list)
+    for edge in edge_list:
+        has_edge_list[edge[0]] = True
+        has_edge_list[edge[1]] = True
+        root1, root2 = find_root(parent_sn_list, edge[0]), find_root(parent_sn_list, edge[1])
+        if root1 != root2:
+            parent_sn_list[root2] = root1
+    component_cnt = sum(1 for sn, parent_sn in enumerate(parent_sn_list) if sn == parent_sn)
 
-    # # F3
-    isolate_cnt = nx.number_of_isolates(hmg)
+    # F3
+    isolate_cnt = has_edge_list.count(False)
     isolate_ratio = isolate_cnt / len(node_list)
 
     return [longest_path_len, component_cnt, isolate_ratio]
 
 
-def get_centrality_features(hmg: nx.DiGraph) -> list:
+def get_adjacency_lists(node_cnt: int, edge_list: list) -> (list, list):
+    """
+    Build the successor and predecessor SN lists of each node.
+    Repeated edges between the same two nodes are kept once, and the neighbors are listed in the order of their first edge,
+        the same as the adjacency of the 'networkx' graph built by 'construct_graph'.
+    :param node_cnt:
+    :param edge_list:
+    :return: succ_sns_list, pred_sns_list
+    """
+    succ_sns_list = [list() for _ in range(node_cnt)]
+    pred_sns_list = [list() for _ in range(node_cnt)]
+    edge_set = set()
+    for edge in edge_list:
+        sn1, sn2 = edge[0], edge[1]
+        if (sn1, sn2) in edge_set:
+            continue
+        edge_set.add((sn1, sn2))
+        succ_sns_list[sn1].append(sn2)
+        pred_sns_list[sn2].append(sn1)
+
+    return succ_sns_list, pred_sns_list
+
+
+def get_pagerank_list(succ_sns_list: list, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6) -> list:
+    """
+    Compute the PageRank of each node by the power iteration of 'nx.pagerank' (with the default parameters).
+    Each step accumulates the rank flowing into a node in the order of the source SN, as the sparse product in 'networkx' does,
+        so that the results are identical.
+    :param succ_sns_list:
+    :param alpha:
+    :param max_iter:
+    :param tol:
+    :return: PageRank of each node, indexed by SN.
+    """
+    node_cnt = len(succ_sns_list)
+    src_sn_list, dst_sn_list = list(), list()
+    for sn, succ_sns in enumerate(succ_sns_list):
+        src_sn_list += [sn] * len(succ_sns)
+        dst_sn_list += succ_sns
+    src_sn_array = np.array(src_sn_list, dtype=np.intp)
+    dst_sn_array = np.array(dst_sn_list, dtype=np.intp)
+    out_degree_array = np.array([len(succ_sns) for succ_sns in succ_sns_list], dtype=float)
+    out_weight_array = np.zeros(node_cnt)
+    has_out_edge = out_degree_array != 0
+    out_weight_array[has_out_edge] = 1.0 / out_degree_array[has_out_edge]
+    edge_weight_array = out_weight_array[src_sn_array]
+
+    x = np.repeat(1.0 / node_cnt, node_cnt)
+    p = np.repeat(1.0 / node_cnt, node_cnt)
+    dangling_sn_array = np.where(out_degree_array == 0)[0]
+    for _ in range(max_iter):
+        x_last = x
+        inflow = np.bincount(dst_sn_array, weights=x[src_sn_array] * edge_weight_array, minlength=node_cnt)
+        x = alpha * (inflow + sum(x[dangling_sn_array]) * p) + (1 - alpha) * p
+        err = np.absolute(x - x_last).sum()
+        if err < node_cnt * tol:
+            return [float(pr) for pr in x]
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def get_degree_centrality_list(succ_sns_list: list, pred_sns_list: list) -> list:
+    """
+    Compute the degree centrality of each node, the same as 'nx.degree_centrality'.
+    :param succ_sns_list:
+    :param pred_sns_list:
+    :return: Degree centrality of each node, indexed by SN.
+    """
+    s = 1.0 / (len(succ_sns_list) - 1.0)
+    return [(len(succ_sns) + len(pred_sns)) * s for succ_sns, pred_sns in zip(succ_sns_list, pred_sns_list)]
+
+
+def get_closeness_centrality(pred_sns_list: list, sn: int) -> float:
+    """
+    Compute the closeness centrality of the given node, the same as 'nx.closeness_centrality' (with 'wf_improved').
+    For the directed graph, the distance is measured along the incoming edges, namely a BFS over the predecessors.
+    :param pred_sns_list:
+    :param sn:
+    :return:
+    """
+    distance_dict = {sn: 0}
+    sn_queue = deque([sn])
+    while sn_queue:
+        cur_sn = sn_queue.popleft()
+        for pred_sn in pred_sns_list[cur_sn]:
+            if pred_sn not in distance_dict:
+                distance_dict[pred_sn] = distance_dict[cur_sn] + 1
+                sn_queue.append(pred_sn)
+
+    total_distance = sum(distance_dict.values())
+    node_cnt = len(pred_sns_list)
+    closeness = 0.0
+    if total_distance > 0.0 and node_cnt > 1:
+        closeness = (len(distance_dict) - 1.0) / total_distance
+        closeness *= (len(distance_dict) - 1.0) / (node_cnt - 1)
+
+    return closeness
+
+
+def get_betweenness_list(succ_sns_list: list) -> list:
+    """
+    Compute the normalized betweenness centrality of each node by the Brandes algorithm,
+        following 'nx.betweenness_centrality' step by step, so that the results are identical.
+    :param succ_sns_list:
+    :return: Betweenness centrality of each node, indexed by SN.
+    """
+    node_cnt = len(succ_sns_list)
+    betweenness_list = [0.0] * node_cnt
+    for s in range(node_cnt):
+        # Count the shortest paths from s by BFS.
+        visited_sn_list = list()
+        pred_sns_list = [list() for _ in range(node_cnt)]
+        sigma_list = [0.0] * node_cnt
+        distance_list = [-1] * node_cnt
+        sigma_list[s] = 1.0
+        distance_list[s] = 0
+        sn_queue = deque([s])
+        while sn_queue:
+            v = sn_queue.popleft()
+            visited_sn_list.append(v)
+            for w in succ_sns_list[v]:
+                if distance_list[w] < 0:
+                    sn_queue.append(w)
+                    distance_list[w] = distance_list[v] + 1
+                if distance_list[w] == distance_list[v] + 1:
+                    sigma_list[w] += sigma_list[v]
+                    pred_sns_list[w].append(v)
+        # Accumulate the dependencies in the reverse BFS order.
+        delta_list = [0] * node_cnt
+        while visited_sn_list:
+            w = visited_sn_list.pop()
+            coeff = (1 + delta_list[w]) / sigma_list[w]
+            for v in pred_sns_list[w]:
+                delta_list[v] += sigma_list[v] * coeff
+            if w != s:
+                betweenness_list[w] += delta_list[w]
+
+    # Normalize by the number of (s, t) node pairs that can pass through a node, excluding the endpoints.
+    if node_cnt - 1 >= 2:
+        scale = 1 / ((node_cnt - 1) * (node_cnt - 2))
+        betweenness_list = [betweenness * scale for betweenness in betweenness_list]
+
+    return betweenness_list
+
+
+def get_centrality_features(node_list: list, edge_list: list, host_sns_dict: dict) -> list:
     """
     Given the constructed directed graph HMG, extracting the 13 centrality features.
     Centrality features focus on the MPR (max page rank) and MDC (max degree centrality) nodes.
@@ -367,26 +586,37 @@ def get_centrality_features(hmg: nx.DiGraph) -> list:
         11. F11: Closeness centrality of MDC node;
         12. F12: Max betweenness centrality of MHG;
         13. F13: The number of nodes with non-zero betweenness centrality.
-    :param hmg:
+    For small HMGs, building the 'networkx' graph costs far more than the centrality computation itself.
+    Hence, their centrality is computed directly on the adjacency lists, following the 'networkx' algorithms.
+    :param node_list:
+    :param edge_list:
+    :param host_sns_dict: Nodes indexed by host, built by 'construct_nodes'.
     :return:
     """
-    pr_dict = nx.pagerank(hmg)
-    # F1, F7
-    pr_sorted_nodes = sorted(pr_dict.items(), key=lambda item: item[1], reverse=True)
-    mpr_node_sn, mpr_node_pr = pr_sorted_nodes[0][0], pr_sorted_nodes[0][1]
-    mpr_node = hmg.nodes[mpr_node_sn]
+    node_cnt = len(node_list)
+    is_small_graph = node_cnt <= SMALL_GRAPH_SIZE
+    if is_small_graph:
+        succ_sns_list, pred_sns_list = get_adjacency_lists(node_cnt, edge_list)
+        pr_list = get_pagerank_list(succ_sns_list)
+        dc_list = get_degree_centrality_list(succ_sns_list, pred_sns_list)
+        betweenness_list = get_betweenness_list(succ_sns_list)
+    else:
+        hmg = construct_graph(node_list, edge_list)
+        # The nodes are added to HMG in SN order, so the values are listed in SN order.
+        pr_list = list(nx.pagerank(hmg).values())
+        dc_list = list(nx.degree_centrality(hmg).values())
+        betweenness_list = list(nx.betweenness_centrality(hmg).values())
 
-    # F2
-    same_pr_domain_cnt = 0
-    for cur_node_sn in hmg.nodes:
-        if cur_node_sn != mpr_node_sn and hmg.nodes[cur_node_sn]['host'] == mpr_node['host']:
-            same_pr_domain_cnt += 1
-    same_pr_domain_ratio = same_pr_domain_cnt / (len(hmg.nodes) - 1)
+    # F1, F7
+    # 'max' keeps the first node among ties, the same as the first node of a stable descending sort.
+    mpr_node_sn = max(range(node_cnt), key=pr_list.__getitem__)
+    mpr_node_pr = pr_list[mpr_node_sn]
+    mpr_node = node_list[mpr_node_sn]
 
     # F3
-    mpr_url_len = len(mpr_node['url'])
+    mpr_url_len = len(mpr_node[1])
 
-    parsed_url = parse.urlparse(mpr_node['url'])
+    parsed_url = parse_url(mpr_node[1])
     #F4
     mpr_url_path = parsed_url.path
     mpr_url_path_depth = mpr_url_path.count('/')
@@ -396,46 +626,47 @@ def get_centrality_features(hmg: nx.DiGraph) -> list:
     # F6
     mpr_url_query_cnt = len(mpr_url_query.split('&'))
 
-    dc_dict = nx.degree_centrality(hmg)
     # F8, F9
-    dc_sorted_nodes = sorted(dc_dict.items(), key=lambda item: item[1], reverse=True)
-    mdc_node_sn, mdc_node_dc = dc_sorted_nodes[0][0], dc_sorted_nodes[0][1]
-    mdc_node = hmg.nodes[mdc_node_sn]
+    mdc_node_sn = max(range(node_cnt), key=dc_list.__getitem__)
+    mdc_node_dc = dc_list[mdc_node_sn]
+    mdc_node = node_list[mdc_node_sn]
 
-    # F10
-    same_dc_domain_cnt = 0
-    for cur_node_sn in hmg.nodes:
-        if cur_node_sn != mdc_node_sn and hmg.nodes[cur_node_sn]['host'] == mdc_node['host']:
-            same_dc_domain_cnt += 1
-    same_dc_domain_ratio = same_dc_domain_cnt / (len(hmg.nodes) - 1)
+    # F2, F10
+    # The nodes sharing the host with the MPR (MDC) node, excluding the MPR (MDC) node itself.
+    same_pr_domain_cnt = len(host_sns_dict[mpr_node[3]]) - 1
+    same_dc_domain_cnt = len(host_sns_dict[mdc_node[3]]) - 1
+    same_pr_domain_ratio = same_pr_domain_cnt / (node_cnt - 1)
+    same_dc_domain_ratio = same_dc_domain_cnt / (node_cnt - 1)
 
     # F11
-    closeness_dict = nx.closeness_centrality(hmg)
-    mdc_closeness = closeness_dict[mdc_node_sn]
+    # Only the closeness of the MDC node is needed, so skip the BFS from every other node.
+    if is_small_graph:
+        mdc_closeness = get_closeness_centrality(pred_sns_list, mdc_node_sn)
+    else:
+        mdc_closeness = nx.closeness_centrality(hmg, u=mdc_node_sn)
 
     # F12
-    betweenness_dict = nx.betweenness_centrality(hmg)
-    max_betweenness = sorted(betweenness_dict.items(), key=lambda item: item[1], reverse=True)[0][1]
+    max_betweenness = max(betweenness_list)
     # F13
-    nonzero_betweenness_cnt = len([item for item in betweenness_dict.items() if item[1] > 0])
+    nonzero_betweenness_cnt = sum(1 for betweenness in betweenness_list if betweenness > 0)
 
     return [mpr_node_sn, same_pr_domain_ratio, mpr_url_len, mpr_url_path_depth, mpr_url_query_len,
             mpr_url_query_cnt, mpr_node_pr, mdc_node_dc, mdc_node_sn, same_dc_domain_ratio,
             mdc_closeness, max_betweenness, nonzero_betweenness_cnt]
 
 
-def get_hmg_features(node_list: list, edge_list: list, hmg: nx.DiGraph) -> list:
+def get_hmg_features(node_list: list, edge_list: list, host_sns_dict: dict) -> list:
     """
     Gathering the total 24 features, including node features, edge features, graph features, and centrality features.
     :param node_list:
     :param edge_list:
-    :param hmg:
+    :param host_sns_dict:
     :return:
     """
     node_features = get_node_features(node_list)
     edge_features = get_edge_features(node_list, edge_list)
-    graph_features = get_graph_features(node_list, edge_list, hmg)
-    centrality_features = get_centrality_features(hmg)
+    graph_features = get_graph_features(node_list, edge_list)
+    centrality_features = get_centrality_features(node_list, edge_list, host_sns_dict)
     hmg_features = node_features + edge_features + graph_features + centrality_features
 
     return hmg_features
@@ -446,8 +677,5 @@ if __name__ == "__main__":
     for sample in os.listdir(sample_dir):
         sample_path = os.path.join(sample_dir, sample)
         log_path = os.path.join(sample_path, 'performance_log.txt')
-        pair_list = extract_request_response_pairs(log_path)
-        node_list = construct_nodes(pair_list)
-        edge_list = construct_edges(node_list)
-        hmg = construct_graph(node_list, edge_list)
-        get_hmg_features(node_list, edge_list, hmg)
+        node_list, edge_list, host_sns_dict = parse_sample(log_path)
+        get_hmg_features(node_list, edge_list, host_sns_dict)